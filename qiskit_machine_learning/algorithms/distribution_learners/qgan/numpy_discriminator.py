@@ -142,10 +142,7 @@ class DiscriminatorNet:
 
         def leaky_relu_backward(da, z, slope=0.2):
             dz = np.array(da, copy=True)
-            for i, line in enumerate(z):
-                for j, element in enumerate(line):
-                    if element < 0:
-                        dz[i, j] = dz[i, j] * slope
+            dz[z < 0] *= slope
             return dz
 
         def single_layer_backward_propagation(da_curr,
@@ -167,14 +164,12 @@ class DiscriminatorNet:
         grads_values = np.array([])
         m = y.shape[1]
         y = y.reshape(np.shape(x))
+        da_prev = np.divide(1 - y, np.maximum(1 - x, 1e-4))
+        da_prev -= np.divide(y, np.maximum(x, 1e-4))
         if weights is not None:
-            da_prev = - np.multiply(
-                weights,
-                np.divide(y, np.maximum(np.ones(np.shape(x)) * 1e-4, x))
-                - np.divide(1 - y, np.maximum(np.ones(np.shape(x)) * 1e-4, 1 - x)))
+            da_prev = np.multiply(weights, da_prev)
         else:
-            da_prev = - (np.divide(y, np.maximum(np.ones(np.shape(x)) * 1e-4, x))
-                         - np.divide(1 - y, np.maximum(np.ones(np.shape(x)) * 1e-4, 1 - x))) / m
+            da_prev /= m
 
         pointer = 0
 
@@ -305,21 +300,15 @@ class NumPyDiscriminator(DiscriminativeNetwork):
         Returns:
             float: loss function
        """
+        # binary cross-entropy with the probabilities clipped at 1e-4 to keep the logarithm finite
+        cross_entropy = np.multiply(y, np.log(np.maximum(x, 1e-4))) \
+            + np.multiply(1 - y, np.log(np.maximum(1 - x, 1e-4)))
         if weights is not None:
             # Use weights as scaling factors for the samples and compute the sum
-            return (-1) * np.dot(np.multiply(y,
-                                             np.log(np.maximum(np.ones(np.shape(x)) * 1e-4, x)))
-                                 + np.multiply(np.ones(np.shape(y)) - y,
-                                               np.log(np.maximum(np.ones(np.shape(x)) * 1e-4,
-                                                                 np.ones(np.shape(x)) - x))),
-                                 weights)
+            return (-1) * np.dot(cross_entropy, weights)
         else:
             # Compute the mean
-            return (-1) * np.mean(np.multiply(y,
-                                              np.log(np.maximum(np.ones(np.shape(x)) * 1e-4, x)))
-                                  + np.multiply(np.ones(np.shape(y)) - y,
-                                                np.log(np.maximum(np.ones(np.shape(x)) * 1e-4,
-                                                                  np.ones(np.shape(x)) - x))))
+            return (-1) * np.mean(cross_entropy)
 
     def _get_objective_function(self, data, weights):
         """
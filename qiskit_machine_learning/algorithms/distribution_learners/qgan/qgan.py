@@ -323,12 +323,14 @@ class QGAN:
     def get_rel_entr(self) -> float:
         """ Get relative entropy between target and trained distribution """
         samples_gen, prob_gen = self._generator.get_output(self._quantum_instance)
-        temp = np.zeros(len(self._grid_elements))
-        for j, sample in enumerate(samples_gen):
-            for i, element in enumerate(self._grid_elements):
-                if sample == element:
-                    temp[i] += prob_gen[j]
-        prob_gen = [1e-8 if x == 0 else x for x in temp]
+        # align the generated probabilities with the grid elements of the target distribution
+        grid_index = {tuple(np.atleast_1d(element)): i
+                      for i, element in enumerate(self._grid_elements)}
+        indices = np.array([grid_index.get(tuple(sample), -1) for sample in samples_gen])
+        found = indices >= 0
+        temp = np.bincount(indices[found], weights=np.asarray(prob_gen)[found],
+                           minlength=len(self._grid_elements))
+        prob_gen = np.where(temp == 0, 1e-8, temp)
         rel_entr = entropy(prob_gen, self._prob_data)
         return rel_entr
 
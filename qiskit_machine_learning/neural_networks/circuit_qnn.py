@@ -28,6 +28,10 @@ from ..exceptions import QiskitMachineLearningError
 class CircuitQNN(SamplingNeuralNetwork):
     """A Sampling Neural Network based on a given quantum circuit."""
 
+    # Maximum number of basis states (2 ** num_qubits) for which measured probabilities are
+    # accumulated densely via the cached interpretation of all basis states.
+    dense_accumulation_threshold = 2 ** 14
+
     def __init__(self, circuit: QuantumCircuit,
                  input_params: Optional[List[Parameter]] = None,
                  weight_params: Optional[List[Parameter]] = None,
@@ -66,33 +70,51 @@ class CircuitQNN(SamplingNeuralNetwork):
 
         # TODO: currently cannot handle statevector simulator, at least throw exception
 
-        # copy circuit and add measurements in case non are given
-        self._circuit = circuit.copy()
+        if isinstance(quantum_instance, (BaseBackend, Backend)):
+            quantum_instance = QuantumInstance(quantum_instance)
+        self._quantum_instance = quantum_instance
+
+        # copy circuit without final measurements, this copy is shared with the gradient
+        if len(circuit.clbits) > 0:
+            # TODO: ideally removing the measurements for the gradient would not be necessary
+            unmeasured_circuit = circuit.remove_final_measurements(inplace=False)
+        else:
+            unmeasured_circuit = circuit.copy()
+
+        # add measurements in case non are given
         if quantum_instance.is_statevector:
-            if len(self._circuit.clbits) > 0:
-                self._circuit.remove_final_measurements()
-        elif len(self._circuit.clbits) == 0:
-            self._circuit.measure_all()
+            self._circuit = unmeasured_circuit
+        elif len(circuit.clbits) == 0:
+            self._circuit = unmeasured_circuit.measure_all(inplace=False)
+        else:
+            self._circuit = circuit.copy()
+
+        # count keys are plain basis state bitstrings only if all qubits are measured into a
+        # single classical register, e.g. not for partial measurements or several registers
+        self._counts_are_basis_states = quantum_instance.is_statevector or (
+            len(self._circuit.cregs) == 1 and
+            self._circuit.cregs[0].size == self._circuit.num_qubits)
 
         self._input_params = list(input_params or [])
         self._weight_params = list(weight_params or [])
         self._interpret = interpret
         self._dense = dense
+        self._interpret_keys: Optional[List[Any]] = None
+        self._interpret_lut: Optional[np.ndarray] = None
         self._gradient = gradient
 
-        if isinstance(quantum_instance, (BaseBackend, Backend)):
-            quantum_instance = QuantumInstance(quantum_instance)
-        self._quantum_instance = quantum_instance
+        # transpile once, parameters are bound to the transpiled circuit in each evaluation
+        self._circuit_transpiled = quantum_instance.transpile(self._circuit)[0]
+        self._circuit_transpiled_params = set(self._circuit_transpiled.parameters)
 
         # TODO this should not be necessary... but currently prop grads fail otherwise
         from qiskit import Aer
-        self._sampler = CircuitSampler(Aer.get_backend('statevector_simulator'), param_qobj=False)
+        self._sampler = CircuitSampler(Aer.get_backend('statevector_simulator'),
+                                       param_qobj=True)
 
         # construct probability gradient opflow object
-        grad_circuit = circuit.copy()
-        grad_circuit.remove_final_measurements()  # TODO: ideally this would not be necessary
         params = list(input_params) + list(weight_params)
-        self._grad_circuit = Gradient().convert(CircuitStateFn(grad_circuit), params)
+        self._grad_circuit = Gradient().convert(CircuitStateFn(unmeasured_circuit), params)
 
         output_shape_: Union[int, Tuple[int, ...]] = -1
         if isinstance(interpret, str):
@@ -161,7 +183,31 @@ class CircuitQNN(SamplingNeuralNetwork):
         elif callable(self._interpret):
             return self._interpret(_bit_string_to_tuple(bitstr))
 
+    def _interpret_lookup(self) -> Tuple[List[Any], np.ndarray]:
+        """Returns the distinct interpreted outputs over all basis states together with a lookup
+        table that maps each basis state index to the position of its output in that list. The
+        table is computed on first use and cached."""
+        if self._interpret_lut is None:
+            num_qubits = self.circuit.num_qubits
+            positions: Dict[Any, int] = {}
+            lut = np.empty(2 ** num_qubits, dtype=np.int64)
+            for k in range(2 ** num_qubits):
+                key = self._interpret_bitstring(("{:0" + str(num_qubits) + "b}").format(k))
+                lut[k] = positions.setdefault(key, len(positions))
+            self._interpret_keys = list(positions)
+            self._interpret_lut = lut
+        return self._interpret_keys, self._interpret_lut
+
+    def _bind_transpiled_circuit(self, param_values: Dict[Parameter, float]) -> QuantumCircuit:
+        """Binds the parameter values to the transpiled circuit, skipping parameters that the
+        transpiler removed, e.g. together with a diagonal gate right before a measurement."""
+        return self._circuit_transpiled.assign_parameters(
+            {p: value for p, value in param_values.items()
+             if p in self._circuit_transpiled_params})
+
     def _sample(self, input_data: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """Returns the samples grouped by measured outcome, i.e., not in the order of the shots,
+        unless measurement error mitigation is used."""
         if self._quantum_instance.is_statevector:
             raise QiskitMachineLearningError('Sampling does not work with statevector simulator!')
 
@@ -169,14 +215,35 @@ class CircuitQNN(SamplingNeuralNetwork):
         param_values = {p: input_data[i] for i, p in enumerate(self.input_params)}
         param_values.update({p: weights[i] for i, p in enumerate(self.weight_params)})
 
+        # mitigated counts are not integer shot counts, read the raw per-shot memory instead
+        use_memory = self.quantum_instance.measurement_error_mitigation_cls is not None
+
         # evaluate operator
-        orig_memory = self.quantum_instance.backend_options.get('memory')
-        self.quantum_instance.backend_options['memory'] = True
-        result = self.quantum_instance.execute(self.circuit.bind_parameters(param_values))
-        self.quantum_instance.backend_options['memory'] = orig_memory
+        if use_memory:
+            orig_memory = self.quantum_instance.backend_options.get('memory')
+            self.quantum_instance.backend_options['memory'] = True
+        result = self.quantum_instance.execute(
+            self._bind_transpiled_circuit(param_values), had_transpiled=True)
+        if use_memory:
+            self.quantum_instance.backend_options['memory'] = orig_memory
+
+            # return samples in shot order, interpreting each distinct bitstring only once
+            memory = np.asarray(result.get_memory())
+            bitstrings, indices = np.unique(memory, return_inverse=True)
+            samples = np.array([self._interpret_bitstring(b) for b in bitstrings])
+            return samples[indices]
 
-        # return samples
-        return np.array([self._interpret_bitstring(b) for b in result.get_memory()])
+        counts = result.get_counts()
+        repeats = np.fromiter(counts.values(), dtype=float, count=len(counts))
+        if np.any(repeats < 0) or np.any(repeats != np.round(repeats)) or \
+                repeats.sum() != self.quantum_instance.run_config.shots:
+            raise QiskitMachineLearningError(
+                'Counts must be non-negative integers summing to the number of shots to be '
+                'expanded to samples!')
+
+        # return samples, interpreting each distinct bitstring only once
+        samples = np.array([self._interpret_bitstring(b) for b in counts])
+        return np.repeat(samples, repeats.astype(int), axis=0)
 
     def _probabilities(self, input_data: np.ndarray, weights: np.ndarray
                        ) -> Union[np.ndarray, Dict[Any, float]]:
@@ -186,20 +253,34 @@ class CircuitQNN(SamplingNeuralNetwork):
 
         # evaluate operator
         result = self.quantum_instance.execute(
-            self.circuit.bind_parameters(param_values))
+            self._bind_transpiled_circuit(param_values), had_transpiled=True)
         counts = result.get_counts()
         shots = sum(counts.values())
-        prob: Dict[Any, float] = {}
-        for b, v in counts.items():
-            key = self._interpret_bitstring(b)
-            prob[key] = prob.get(key, 0.0) + v / shots
+        values = np.fromiter(counts.values(), dtype=float, count=len(counts)) / shots
+
+        num_qubits = self.circuit.num_qubits
+        if self._counts_are_basis_states and 2 ** num_qubits <= self.dense_accumulation_threshold:
+            # accumulate densely over the interpreted outputs of all basis states
+            all_keys, lut = self._interpret_lookup()
+            basis_states = np.fromiter((int(b, 2) for b in counts), dtype=np.int64,
+                                       count=len(counts))
+            totals = np.bincount(lut[basis_states], weights=values, minlength=len(all_keys))
+            # keep every output that occurs in the counts, even if its total is zero
+            measured = np.unique(lut[basis_states])
+            keys = [all_keys[i] for i in measured]
+            values = totals[measured]
+        else:
+            keys = [self._interpret_bitstring(b) for b in counts]
 
         if self._dense:
+            # the interpreted outputs are the indices into the dense output
             prob_array = np.zeros(self._output_shape)
-            for k, prob_value in prob.items():
-                prob_array[0, k] = prob_value
+            prob_array[0] = np.bincount(keys, weights=values, minlength=self._output_shape[1])
             return prob_array
         else:
+            prob: Dict[Any, float] = {}
+            for key, value in zip(keys, values):
+                prob[key] = prob.get(key, 0.0) + value
             return prob
 
     def _probability_gradients(self, input_data: np.ndarray, weights: np.ndarray
@@ -209,42 +290,35 @@ class CircuitQNN(SamplingNeuralNetwork):
         param_values = {p: input_data[i] for i, p in enumerate(self.input_params)}
         param_values.update({p: weights[i] for i, p in enumerate(self.weight_params)})
 
-        # TODO: additional "bind_parameters" should not be necessary, seems like a bug to be fixed
-        grad = self._sampler.convert(self._grad_circuit, param_values
-                                     ).bind_parameters(param_values).eval()
-
-        # TODO: map to dictionary to pretend sparse logic --> needs to be fixed in opflow!
-        input_grad_dicts: List[Dict] = []
-        if self.num_inputs > 0:
-            input_grad_dicts = [{} for _ in range(self.num_inputs)]
-            for i in range(self.num_inputs):
-                for k in range(2 ** self.circuit.num_qubits):
-                    key = self._interpret_bitstring(("{:0" + str(self.circuit.num_qubits) + "b}"
-                                                     ).format(k))
-                    input_grad_dicts[i][key] = (input_grad_dicts[i].get(key, 0.0) +
-                                                np.real(grad[i][k]))
-
-        weights_grad_dicts: List[Dict] = []
-        if self.num_weights > 0:
-            weights_grad_dicts = [{} for _ in range(self.num_weights)]
-            for i in range(self.num_weights):
-                for k in range(2 ** self.circuit.num_qubits):
-                    key = self._interpret_bitstring(("{:0" + str(self.circuit.num_qubits) + "b}"
-                                                     ).format(k))
-                    weights_grad_dicts[i][key] = (weights_grad_dicts[i].get(key, 0.0) +
-                                                  np.real(grad[i + self.num_inputs][k]))
+        # the sampler only binds the circuits, the gradient coefficients may still contain
+        # parameters (e.g. from the chain rule for parameter expressions) that need binding
+        grad = self._sampler.convert(self._grad_circuit, param_values)
+        if grad.parameters:
+            grad = grad.bind_parameters(param_values)
+        grad = grad.eval()
+
+        # accumulate the gradients of all basis states with the same interpreted output
+        # with a single scatter over the flattened (parameter, output) index
+        keys, lut = self._interpret_lookup()
+        grad_real = np.real(np.asarray(grad))
+        num_params, num_keys = len(grad_real), len(keys)
+        indices = np.arange(num_params)[:, np.newaxis] * num_keys + lut
+        grad_values = np.bincount(indices.ravel(), weights=grad_real.ravel(),
+                                  minlength=num_params * num_keys
+                                  ).reshape(num_params, num_keys)
+        input_grad_values = grad_values[:self.num_inputs]
+        weights_grad_values = grad_values[self.num_inputs:]
 
         if self._dense:
+            # the interpreted outputs are the indices into the dense output
+            indices = np.asarray(keys)
             input_grad_array = np.zeros((self.num_inputs, *self.output_shape))
-            for i in range(self.num_inputs):
-                for k, grad in input_grad_dicts[i].items():
-                    input_grad_array[i, 0, k] = grad
-
+            input_grad_array[:, 0, indices] = input_grad_values
             weights_grad_array = np.zeros((self.num_weights, *self.output_shape))
-            for i in range(self.num_weights):
-                for k, grad in weights_grad_dicts[i].items():
-                    weights_grad_array[i, 0, k] = grad
-
+            weights_grad_array[:, 0, indices] = weights_grad_values
             return input_grad_array, weights_grad_array
         else:
+            # TODO: map to dictionary to pretend sparse logic --> needs to be fixed in opflow!
+            input_grad_dicts = [dict(zip(keys, values)) for values in input_grad_values]
+            weights_grad_dicts = [dict(zip(keys, values)) for values in weights_grad_values]
             return input_grad_dicts, weights_grad_dicts
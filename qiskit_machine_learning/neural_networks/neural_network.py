@@ -69,13 +69,13 @@ class NeuralNetwork(ABC):
     def _validate_input(self, input_data: Optional[Union[List[float], np.ndarray, float]]):
         if input_data is None:
             return None
-        input_ = np.array(input_data)
+        input_ = np.asarray(input_data)
         return input_.reshape(self.num_inputs)
 
     def _validate_weights(self, weights: Optional[Union[List[float], np.ndarray, float]]):
         if weights is None:
             return None
-        weights_ = np.array(weights)
+        weights_ = np.asarray(weights)
         return weights_.reshape(self.num_weights)
 
     def forward(self, input_data: Optional[Union[List[float], np.ndarray, float]],
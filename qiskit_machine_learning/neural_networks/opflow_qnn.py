@@ -13,7 +13,6 @@
 """An Opflow Quantum Neural Network that allows to use a parametrized opflow object as a
 neural network."""
 
-from copy import deepcopy
 from typing import List, Optional, Union, Tuple, Dict
 
 import numpy as np
@@ -59,10 +58,11 @@ class OpflowQNN(NeuralNetwork):
             self.quantum_instance = quantum_instance
             self.circuit_sampler = CircuitSampler(
                 self.quantum_instance,
-                param_qobj=is_aer_provider(self.quantum_instance.backend)
+                param_qobj=is_aer_provider(self.quantum_instance.backend),
+                caching='all'
             )
-            # TODO: replace by extended caching in circuit sampler after merged: "caching='all'"
-            self.gradient_sampler = deepcopy(self.circuit_sampler)
+            # the sampler caches both the forward and the gradient operator
+            self.gradient_sampler = self.circuit_sampler
         else:
             self.quantum_instance = None
             self.circuit_sampler = None
@@ -106,8 +106,7 @@ class OpflowQNN(NeuralNetwork):
         else:
             op = self.forward_operator.bind_parameters(param_values)
             result = np.real(op.eval())
-        result = np.array(result)
-        return result.reshape(self.output_shape)
+        return np.asarray(result).reshape(self.output_shape)
 
     def _backward(self, input_data: Optional[np.ndarray], weights: Optional[np.ndarray]
                   ) -> Tuple[Optional[Union[np.ndarray, List[Dict]]],
@@ -127,10 +126,10 @@ class OpflowQNN(NeuralNetwork):
             grad = np.real(grad.eval())
 
         # split into and return input and weights gradients
-        input_grad = np.array(grad[:len(input_data)]).reshape(
+        input_grad = np.asarray(grad[:len(input_data)]).reshape(
             *self.output_shape, self.num_inputs)
 
-        weights_grad = np.array(grad[len(input_data):]).reshape(
+        weights_grad = np.asarray(grad[len(input_data):]).reshape(
             *self.output_shape, self.num_weights)
 
         return input_grad, weights_grad
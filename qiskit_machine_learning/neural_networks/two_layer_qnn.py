@@ -15,7 +15,6 @@ to map the input data to a quantum states and a second one representing a variat
 be trained to solve a particular tasks."""
 from typing import Optional, Union
 
-import numpy as np
 from qiskit import QuantumCircuit
 from qiskit.circuit.library import RealAmplitudes, ZZFeatureMap
 from qiskit.opflow import PauliSumOp, StateFn, OperatorBase
@@ -50,15 +49,11 @@ class TwoLayerQNN(OpflowQNN):
 
         # TODO: circuits need to have well-defined parameter order!
         self.feature_map = feature_map if feature_map else ZZFeatureMap(num_qubits)
-        idx = np.argsort([p.name for p in self.feature_map.parameters])
-        input_params = list(self.feature_map.parameters)
-        input_params = [input_params[i] for i in idx]
+        input_params = sorted(self.feature_map.parameters, key=lambda p: p.name)
 
         # TODO: circuits need to have well-defined parameter order!
         self.var_form = var_form if var_form else RealAmplitudes(num_qubits)
-        idx = np.argsort([p.name for p in self.var_form.parameters])
-        weight_params = list(self.var_form.parameters)
-        weight_params = [weight_params[i] for i in idx]
+        weight_params = sorted(self.var_form.parameters, key=lambda p: p.name)
 
         # construct circuit
         self.qc = QuantumCircuit(num_qubits)
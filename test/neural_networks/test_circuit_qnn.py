@@ -18,7 +18,7 @@ from test import QiskitMachineLearningTestCase
 
 import numpy as np
 from qiskit import Aer
-from qiskit.circuit import QuantumCircuit
+from qiskit.circuit import QuantumCircuit, QuantumRegister, ClassicalRegister, Parameter
 from qiskit.circuit.library import RealAmplitudes, ZZFeatureMap
 from qiskit.utils import QuantumInstance
 
@@ -63,6 +63,196 @@ class TestCircuitQNN(QiskitMachineLearningTestCase):
         self.assertAlmostEqual(result[1], 0.81484, places=4)
         self.assertAlmostEqual(result[-1], 0.18516, places=4)
 
+    def test_circuit_qnn_dense(self):
+        """Circuit QNN Dense Test."""
+
+        def parity_index(x):
+            return sum(x) % 2
+
+        qnn = CircuitQNN(self.qnn.circuit, self.qnn.input_params, self.qnn.weight_params,
+                         interpret=parity_index, dense=True, output_shape=2,
+                         quantum_instance=self.qnn.quantum_instance)
+
+        input_data = np.zeros(qnn.num_inputs)
+        weights = np.zeros(qnn.num_weights)
+
+        result = qnn.probabilities(input_data, weights)
+        self.assertEqual(result.shape, qnn.output_shape)
+        self.assertAlmostEqual(result[0, 0], 0.81484, places=4)
+        self.assertAlmostEqual(result[0, 1], 0.18516, places=4)
+
+        input_grad, weights_grad = qnn.probability_gradients(input_data, weights)
+        self.assertEqual(input_grad.shape, (qnn.num_inputs, *qnn.output_shape))
+        self.assertEqual(weights_grad.shape, (qnn.num_weights, *qnn.output_shape))
+        np.testing.assert_array_almost_equal(weights_grad[:, 0].sum(axis=1), 0)
+
+    def test_circuit_qnn_gradients(self):
+        """Circuit QNN Gradients Test, dense and sparse against finite differences."""
+
+        def hamming_weight(x):
+            # merges the basis states 01 and 10 into a single output
+            return sum(x)
+
+        qnn_dense = CircuitQNN(self.qnn.circuit, self.qnn.input_params, self.qnn.weight_params,
+                               interpret=hamming_weight, dense=True, output_shape=3,
+                               quantum_instance=self.qnn.quantum_instance)
+        qnn_sparse = CircuitQNN(self.qnn.circuit, self.qnn.input_params, self.qnn.weight_params,
+                                interpret=hamming_weight, output_shape=3,
+                                quantum_instance=self.qnn.quantum_instance)
+
+        input_data = np.array([0.3, -0.7])
+        weights = np.array([0.1, 0.5, -0.4, 1.2])
+
+        # central finite differences of the dense probabilities
+        def finite_differences(values, probabilities, eps=1e-5):
+            grad = np.zeros((len(values), *qnn_dense.output_shape))
+            for i in range(len(values)):
+                shift = np.zeros(len(values))
+                shift[i] = eps
+                grad[i] = probabilities(values + shift) - probabilities(values - shift)
+            return grad / (2 * eps)
+
+        ref_input_grad = finite_differences(
+            input_data, lambda x: qnn_dense.probabilities(x, weights))
+        ref_weights_grad = finite_differences(
+            weights, lambda w: qnn_dense.probabilities(input_data, w))
+
+        input_grad, weights_grad = qnn_dense.probability_gradients(input_data, weights)
+        np.testing.assert_array_almost_equal(input_grad, ref_input_grad)
+        np.testing.assert_array_almost_equal(weights_grad, ref_weights_grad)
+
+        sparse_input_grad, sparse_weights_grad = qnn_sparse.probability_gradients(input_data,
+                                                                                  weights)
+        for sparse_grad, dense_grad in [(sparse_input_grad, input_grad),
+                                        (sparse_weights_grad, weights_grad)]:
+            self.assertEqual(len(sparse_grad), len(dense_grad))
+            for sparse_row, dense_row in zip(sparse_grad, dense_grad):
+                self.assertTrue(set(sparse_row).issubset(range(3)))
+                np.testing.assert_array_almost_equal(
+                    [sparse_row.get(k, 0) for k in range(3)], dense_row[0])
+
+    def test_circuit_qnn_repeated_gradients(self):
+        """Circuit QNN Test for repeated gradient evaluations on the same network."""
+
+        qnn = CircuitQNN(self.qnn.circuit, self.qnn.input_params, self.qnn.weight_params,
+                         interpret=self.qnn.interpret, quantum_instance=self.qnn.quantum_instance)
+
+        for input_data, weights in [(np.zeros(2), np.zeros(4)),
+                                    (np.array([0.3, -0.7]), np.array([0.1, 0.5, -0.4, 1.2]))]:
+            input_grad, weights_grad = qnn.probability_gradients(input_data, weights)
+
+            # a fresh network must not see any state from previous evaluations
+            fresh_qnn = CircuitQNN(self.qnn.circuit, self.qnn.input_params,
+                                   self.qnn.weight_params, interpret=self.qnn.interpret,
+                                   quantum_instance=self.qnn.quantum_instance)
+            ref_input_grad, ref_weights_grad = fresh_qnn.probability_gradients(input_data,
+                                                                               weights)
+            for grad, ref_grad in zip(input_grad + weights_grad,
+                                      ref_input_grad + ref_weights_grad):
+                self.assertEqual(set(grad), set(ref_grad))
+                np.testing.assert_array_almost_equal([grad[k] for k in ref_grad],
+                                                     list(ref_grad.values()))
+
+    def test_circuit_qnn_sample(self):
+        """Circuit QNN Sample Test."""
+
+        quantum_instance = QuantumInstance(Aer.get_backend('qasm_simulator'), shots=100,
+                                           seed_simulator=12, seed_transpiler=12)
+        qnn = CircuitQNN(self.qnn.circuit, self.qnn.input_params, self.qnn.weight_params,
+                         interpret='tuple', quantum_instance=quantum_instance)
+
+        input_data = np.zeros(qnn.num_inputs)
+        weights = np.ones(qnn.num_weights)
+
+        result = qnn.sample(input_data, weights)
+        self.assertEqual(result.shape, (100, 2))
+        self.assertTrue(np.all(np.isin(result, [0, 1])))
+
+    def test_circuit_qnn_removed_parameter(self):
+        """Circuit QNN Test with a parameter removed by the transpiler."""
+
+        x, w = Parameter('x'), Parameter('w')
+        qc = QuantumCircuit(1, 1)
+        qc.ry(x, 0)
+        qc.rz(w, 0)  # diagonal gate before the measurement is removed by the transpiler
+        qc.measure(0, 0)
+
+        quantum_instance = QuantumInstance(Aer.get_backend('qasm_simulator'), shots=100,
+                                           optimization_level=3,
+                                           seed_simulator=12, seed_transpiler=12)
+        qnn = CircuitQNN(qc, [x], [w], interpret='int', quantum_instance=quantum_instance)
+
+        result = qnn.probabilities([np.pi], [0.5])
+        self.assertEqual(result, {1: 1.0})
+
+        result = qnn.sample([np.pi], [0.5])
+        self.assertEqual(result.shape, (100,))
+        self.assertTrue(np.all(result == 1))
+
+    def test_circuit_qnn_sample_mitigated(self):
+        """Circuit QNN Sample Test with measurement error mitigation."""
+
+        try:
+            from qiskit.ignis.mitigation.measurement import CompleteMeasFitter
+            from qiskit.providers.aer.noise import NoiseModel, ReadoutError
+        except ImportError:
+            self.skipTest('qiskit-ignis not installed, skipping test')
+
+        noise_model = NoiseModel()
+        noise_model.add_all_qubit_readout_error(ReadoutError([[0.9, 0.1], [0.2, 0.8]]))
+        quantum_instance = QuantumInstance(Aer.get_backend('qasm_simulator'), shots=100,
+                                           noise_model=noise_model,
+                                           measurement_error_mitigation_cls=CompleteMeasFitter,
+                                           seed_simulator=12, seed_transpiler=12)
+        qnn = CircuitQNN(self.qnn.circuit, self.qnn.input_params, self.qnn.weight_params,
+                         interpret='tuple', quantum_instance=quantum_instance)
+
+        input_data = np.zeros(qnn.num_inputs)
+        weights = np.ones(qnn.num_weights)
+
+        result = qnn.sample(input_data, weights)
+        self.assertEqual(result.shape, (100, 2))
+        self.assertTrue(np.all(np.isin(result, [0, 1])))
+
+    def test_circuit_qnn_partial_measurement(self):
+        """Circuit QNN Test with a partial measurement into two classical registers."""
+
+        x, w = Parameter('x'), Parameter('w')
+        qc = QuantumCircuit(QuantumRegister(3), ClassicalRegister(1, 'a'),
+                            ClassicalRegister(1, 'b'))
+        qc.ry(x, 0)
+        qc.h(1)
+        qc.ry(w, 2)
+        qc.measure(0, 0)
+        qc.measure(2, 1)
+
+        quantum_instance = QuantumInstance(Aer.get_backend('qasm_simulator'), shots=100,
+                                           seed_simulator=12, seed_transpiler=12)
+        qnn = CircuitQNN(qc, [x], [w], interpret='tuple', quantum_instance=quantum_instance)
+
+        # count keys like '0 1' have as many characters as the circuit has qubits
+        result = qnn.probabilities([np.pi], [0.0])
+        self.assertEqual(result, {(0, 0, 1): 1.0})
+
+    def test_circuit_qnn_dense_accumulation(self):
+        """Circuit QNN Test that dense and key-by-key accumulation of the counts agree."""
+
+        quantum_instance = QuantumInstance(Aer.get_backend('qasm_simulator'), shots=100,
+                                           seed_simulator=12, seed_transpiler=12)
+        input_data = np.array([0.3, -0.7])
+        weights = np.array([0.1, 0.5, -0.4, 1.2])
+
+        results = []
+        for threshold in [CircuitQNN.dense_accumulation_threshold, 0]:
+            qnn = CircuitQNN(self.qnn.circuit, self.qnn.input_params, self.qnn.weight_params,
+                             interpret=self.qnn.interpret, quantum_instance=quantum_instance)
+            qnn.dense_accumulation_threshold = threshold
+            results.append(qnn.probabilities(input_data, weights))
+
+        self.assertEqual(set(results[0]), set(results[1]))
+        for key, value in results[0].items():
+            self.assertAlmostEqual(value, results[1][key])
+
 
 if __name__ == '__main__':
     unittest.main()